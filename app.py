@@ -12,13 +12,13 @@ import streamlit as st
 import yaml
 import os
 import chromadb
-import time
 
 # Import your existing chatbot functions and utilities
 from utils.logger import setup_logger
 from smart_chatbot.embedder import embed_query
 from smart_chatbot.retriever import retrieve_relevant_chunks
-from smart_chatbot.generator import generate_response
+from smart_chatbot.generator import stream_response
+from smart_chatbot.semantic_cache import SemanticCache
 
 # --- 1. Utility and Initialization Functions ---
 
@@ -49,23 +49,57 @@ def load_database(config: dict):
     """Initializes a connection to the ChromaDB vector store."""
     client = chromadb.PersistentClient(path=config['paths']['vector_store'])
     collection_name = config['vector_db']['collection_name']
-    
-    # --- CHANGE THIS LINE ---
-    # FROM:
-    # collection = client.get_collection(name=collection_name)
-    
-    # TO:
-    collection = client.get_or_create_collection(name=collection_name)
-    
+
+    # HNSW parameters sized for a PBAC-scale corpus instead of Chroma's
+    # tiny-collection defaults. Chroma 0.4.x copies hnsw:* metadata into the
+    # index segment once when the collection is created and never re-reads
+    # it, so these settings (including the cosine space) only take effect on
+    # a freshly built index — existing collections keep their original
+    # parameters until reindexed.
+    collection = client.get_or_create_collection(
+        name=collection_name,
+        metadata={
+            "hnsw:space": "cosine",
+            "hnsw:M": 32,
+            "hnsw:construction_ef": 200,
+            "hnsw:search_ef": 64,
+            "hnsw:batch_size": 500,
+            "hnsw:sync_threshold": 2000,
+        }
+    )
+
     print(f"Database loaded successfully. Using collection: {collection_name}")
     return collection
 
+@st.cache_resource
+def load_semantic_cache():
+    """Initializes the FAISS-backed semantic cache for paraphrased queries."""
+    return SemanticCache()
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def _cached_embed(prompt: str, model_name: str) -> list:
+    """Caches query embeddings so repeated/example questions skip the embedder call."""
+    embedding = embed_query(prompt, config)
+    if not embedding:
+        # embed_query returns [] when the backend call fails. Raise instead
+        # of returning it: st.cache_data does not cache exceptions, so the
+        # next attempt retries the embedder rather than replaying the
+        # failure for the rest of the session.
+        raise RuntimeError("The embedding service returned no embedding. Is the backend running?")
+    return embedding
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def _cached_retrieve(emb_key: tuple, n_results: int) -> dict:
+    """Caches Chroma retrievals keyed on a rounded embedding tuple (collection comes from the cached resource)."""
+    return retrieve_relevant_chunks([list(emb_key)], collection, config)
+
 
 # --- 2. Load Configurations and Backend ---
 
 config = load_backend_config()
 ui_config = load_ui_config()
 collection = load_database(config)
+semantic_cache = load_semantic_cache()
 
 # --- 3. Page and Sidebar Configuration ---
 
@@ -89,12 +123,21 @@ with st.sidebar:
         st.session_state.messages = [
             {"role": "assistant", "content": ui_config.get('welcome_message', "Hello!")}
         ]
+        # Also refresh the cached chunk count in case the collection was
+        # reindexed out-of-band.
+        st.session_state.doc_chunk_count = collection.count()
         st.rerun()
 
 # --- 4. Chat Interface ---
 
 st.title("🧠 AI Document Intelligence")
-st.caption(f"Powered by `{embedding_provider.capitalize()}`. Currently searching `{collection.count()}` document chunks.")
+
+# collection.count() runs a SQLite COUNT on every evaluation, so compute it
+# once per session instead of on every rerun.
+if "doc_chunk_count" not in st.session_state:
+    st.session_state.doc_chunk_count = collection.count()
+
+st.caption(f"Powered by `{embedding_provider.capitalize()}`. Currently searching `{st.session_state.doc_chunk_count}` document chunks.")
 
 # Initialize or load chat history
 if "messages" not in st.session_state:
@@ -102,18 +145,30 @@ if "messages" not in st.session_state:
         {"role": "assistant", "content": ui_config.get('welcome_message', "Hello!")}
     ]
 
-# Display chat history
-for message in st.session_state.messages:
-    with st.chat_message(message["role"]):
-        st.markdown(message["content"])
-        if message["role"] == "assistant" and "sources" in message and message["sources"]:
-            with st.expander("View Retrieved Sources"):
-                for source in message["sources"]:
-                    with st.container(border=True):
-                        st.markdown(f"**Source Document:** `{source.get('title', 'N/A')}`")
-                        st.markdown(f"**Section:** `{source.get('section', 'N/A')}`")
-                        st.markdown(f"**Relevance Score (Distance):** `{source.get('distance', 0.0):.4f}`")
-                        st.caption(f"Retrieved Text Snippet:\n\n> {source.get('text', '').replace('%', ' ')}")
+# Display chat history inside a fragment, so interactions scoped to other
+# fragments re-render only themselves instead of replaying N turns of
+# markdown and expanders on every rerun.
+def _render_sources(sources: list):
+    """Renders the retrieved-sources expander for an assistant message."""
+    if not sources:
+        return
+    with st.expander("View Retrieved Sources"):
+        for source in sources:
+            with st.container(border=True):
+                st.markdown(f"**Source Document:** `{source.get('title', 'N/A')}`")
+                st.markdown(f"**Section:** `{source.get('section', 'N/A')}`")
+                st.markdown(f"**Relevance Score (Distance):** `{source.get('distance', 0.0):.4f}`")
+                st.caption(f"Retrieved Text Snippet:\n\n> {source.get('text', '').replace('%', ' ')}")
+
+@st.fragment
+def _render_history():
+    for message in st.session_state.messages:
+        with st.chat_message(message["role"]):
+            st.markdown(message["content"])
+            if message["role"] == "assistant":
+                _render_sources(message.get("sources"))
+
+_render_history()
 
 # --- NEW: Display Example Questions if chat is new ---
 if len(st.session_state.messages) <= 1:
@@ -141,34 +196,68 @@ if prompt:
         # --- NEW: Enhanced Status Indicator ---
         with st.status("Thinking...", expanded=False) as status:
             st.write("Embedding your question...")
-            query_embedding = embed_query(prompt, config)
-            time.sleep(0.5) # Small delay for better UX
+            try:
+                query_embedding = _cached_embed(prompt, embedding_provider)
+            except RuntimeError as e:
+                status.update(label="Embedding failed", state="error", expanded=True)
+                st.error(f"Could not embed your question: {e}")
+                st.stop()
 
-            st.write("Searching knowledge base...")
-            context_chunks = retrieve_relevant_chunks(query_embedding, collection, config)
-            time.sleep(0.5)
+            # A paraphrase hit reuses the stored retrieval and answer outright
+            cached = semantic_cache.lookup(query_embedding)
+            response_text = None
+            if cached is not None:
+                context_chunks = cached["context_chunks"]
+                response_text = cached["response_text"]
+                status.update(label="Answered from cache!", state="complete", expanded=False)
+            else:
+                status.update(label="Searching knowledge base...")
+                # Round the embedding so float jitter doesn't defeat the cache key
+                emb_key = tuple(round(x, 6) for x in query_embedding)
+                top_k = config.get("vector_db", {}).get("top_k_results", 5)
+                context_chunks = _cached_retrieve(emb_key, top_k)
+                status.update(label="Generating final answer...")
 
-            st.write("Generating final answer...")
-            response_text = generate_response(prompt, context_chunks, config)
-            status.update(label="Response generated!", state="complete", expanded=False)
+            sources_for_display = []
+            if context_chunks.get("documents") and context_chunks["documents"][0]:
+                docs = context_chunks['documents'][0]
+                metas = context_chunks['metadatas'][0]
+                dists = context_chunks['distances'][0]
+                sources_for_display = [
+                    {
+                        "title": meta.get('doc_title', 'N/A'),
+                        "section": meta.get('section_heading', 'N/A'),
+                        "text": doc_text,
+                        "distance": distance
+                    }
+                    for doc_text, meta, distance in zip(docs, metas, dists)
+                ]
 
-        st.markdown(response_text)
+        if response_text is None:
+            # Stream tokens as they arrive so the first words appear well
+            # before the LLM finishes decoding.
+            stream_error = {}
+            response_text = st.write_stream(stream_response(prompt, context_chunks, config, error_state=stream_error))
+            # Never cache failures: a transient outage must not become the
+            # persisted answer for this question and its paraphrases. The
+            # out-of-band flag also catches mid-stream errors, which land
+            # after partial answer text and are invisible to a prefix check.
+            if not stream_error.get("failed"):
+                semantic_cache.add(prompt, query_embedding, context_chunks, response_text)
+            # The status handle stays valid after its with-block, so mark the
+            # turn complete only once streaming has actually finished.
+            status.update(label="Response generated!", state="complete", expanded=False)
+        else:
+            st.markdown(response_text)
 
-        sources_for_display = []
-        if context_chunks.get("documents") and context_chunks["documents"][0]:
-            for i in range(len(context_chunks['documents'][0])):
-                meta = context_chunks['metadatas'][0][i]
-                sources_for_display.append({
-                    "title": meta.get('doc_title', 'N/A'),
-                    "section": meta.get('section_heading', 'N/A'),
-                    "text": context_chunks['documents'][0][i],
-                    "distance": context_chunks['distances'][0][i]
-                })
+        # Show this turn's sources now: without a forced rerun the history
+        # fragment won't redraw them until the next interaction.
+        _render_sources(sources_for_display)
 
+    # The turn is already rendered above; the appended message is picked up
+    # by the next natural rerun, so no forced full-page rerun is needed.
     st.session_state.messages.append({
         "role": "assistant",
         "content": response_text,
         "sources": sources_for_display
-    })
-    
-    st.rerun()
\ No newline at end of file
+    })
\ No newline at end of file
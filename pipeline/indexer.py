@@ -69,7 +69,19 @@ def index_documents(config: Dict[str, Any]):
     # 1. Setup ChromaDB client and collection
     print(f"🚀 Initializing ChromaDB vector store at: {db_path}")
     client = chromadb.PersistentClient(path=db_path)
-    collection = client.get_or_create_collection(name=collection_name)
+    # HNSW parameters tuned for a PBAC-scale corpus; these construction-time
+    # settings apply when the collection is first created.
+    collection = client.get_or_create_collection(
+        name=collection_name,
+        metadata={
+            "hnsw:space": "cosine",
+            "hnsw:M": 32,
+            "hnsw:construction_ef": 200,
+            "hnsw:search_ef": 64,
+            "hnsw:batch_size": 500,
+            "hnsw:sync_threshold": 2000,
+        }
+    )
     print(f"Collection '{collection_name}' loaded/created with {collection.count()} documents.")
     
     # 2. Find all embedding files to process
@@ -1,10 +1,16 @@
 # smart_chatbot/embedder.py
 
+import orjson
 import requests
-import json
+from requests.adapters import HTTPAdapter
 import google.generativeai as genai
 import os
 
+# Module-level session so repeated queries reuse the same TCP connection to
+# Ollama (HTTP keep-alive) instead of paying the handshake on every call.
+_SESSION = requests.Session()
+_SESSION.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
 def embed_query(text: str, config: dict) -> list[float]:
     """
     Embeds a user query using the configured provider (Gemini or Ollama).
@@ -36,10 +42,16 @@ def embed_query(text: str, config: dict) -> list[float]:
         
         payload = {"model": model, "prompt": text}
         try:
-            response = requests.post(url, headers={"Content-Type": "application/json"}, data=json.dumps(payload))
+            response = _SESSION.post(
+                url,
+                data=orjson.dumps(payload),
+                headers={"Content-Type": "application/json"},
+                timeout=(3, 30)
+            )
             response.raise_for_status()
-            data = response.json()
-            return data.get("embedding", [])
+            # orjson parses the 768-float embedding array noticeably faster
+            # than requests' stdlib-json .json() on this per-query hot path
+            return orjson.loads(response.content).get("embedding", [])
         except requests.RequestException as e:
             print(f"Error embedding query with Ollama: {e}")
             return []
@@ -1,31 +1,75 @@
 # smart_chatbot/generator.py
 
+import orjson
 import requests
-import json
+from requests.adapters import HTTPAdapter
 import google.generativeai as genai
 from smart_chatbot.prompts import build_prompt
 
+# Shared keep-alive session for the Ollama branch, mirroring the one in
+# embedder.py, so generation calls reuse connections across chat turns.
+_SESSION = requests.Session()
+_SESSION.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
+# Cache of GenerativeModel handles keyed on (model_name, system prompt hash),
+# so per-request auth/channel initialization happens once per configuration
+# instead of on every chat turn.
+_GEMINI_MODELS = {}
+
+# The system prompt is static, so build it once at import time rather than
+# on every turn.
+_SYSTEM_PROMPT = build_prompt()
+
+# Canned answer for zero-hit retrievals; matches the exact sentence the
+# system prompt instructs the LLM to produce, without paying for the call.
+_NO_CONTEXT_RESPONSE = (
+    "Based on the provided context, there is no information available to answer this question."
+)
+
+# Prefix of the locally-produced failure message yielded/returned when a
+# provider call fails; lets callers tell a failed generation apart from a
+# real answer (e.g. to avoid caching it).
+_ERROR_PREFIX = "Error connecting to the generative model:"
+
+def is_error_response(text: str) -> bool:
+    """Returns True if the text is a locally-produced generation failure message."""
+    return text.startswith(_ERROR_PREFIX)
+
+def _get_gemini_model(model_name: str, system_prompt: str) -> genai.GenerativeModel:
+    """Returns a cached GenerativeModel for the given model name and system prompt."""
+    key = (model_name, hash(system_prompt))
+    model = _GEMINI_MODELS.get(key)
+    if model is None:
+        model = genai.GenerativeModel(model_name, system_instruction=system_prompt)
+        _GEMINI_MODELS[key] = model
+    return model
+
+def _build_context_str(context_chunks: dict) -> str:
+    """Builds the detailed context string from the ChromaDB results."""
+    if context_chunks.get("documents") and context_chunks["documents"][0]:
+        docs = context_chunks['documents'][0]
+        metas = context_chunks['metadatas'][0]
+        parts = [
+            f"Source (doc_id: {meta.get('doc_id', 'N/A')}, title: {meta.get('doc_title', 'N/A')}):\n"
+            f"Content: {doc_text}\n---\n"
+            for doc_text, meta in zip(docs, metas)
+        ]
+        return "".join(parts)
+    return "No relevant context was found in the database."
+
 def generate_response(user_query: str, context_chunks: dict, config: dict) -> str:
     """
     Generates a grounded response using the configured generative LLM (Gemini or Ollama).
     """
-    system_prompt = build_prompt()
-    
-    # Build a detailed context string from the ChromaDB results
-    context_str = ""
-    if context_chunks.get("documents") and context_chunks["documents"][0]:
-        for i in range(len(context_chunks['documents'][0])):
-            doc_text = context_chunks['documents'][0][i]
-            meta = context_chunks['metadatas'][0][i]
-            doc_title = meta.get('doc_title', 'N/A')
-            doc_id = meta.get('doc_id', 'N/A')
-            context_str += f"Source (doc_id: {doc_id}, title: {doc_title}):\n"
-            context_str += f"Content: {doc_text}\n---\n"
-    else:
-        context_str = "No relevant context was found in the database."
+    docs = context_chunks.get("documents") or [[]]
+    if not docs[0]:
+        # No retrieval hits: respond locally instead of paying an LLM round-trip
+        return _NO_CONTEXT_RESPONSE
 
+    system_prompt = _SYSTEM_PROMPT
+    context_str = _build_context_str(context_chunks)
     final_prompt = f"CONTEXT:\n{context_str}\n\nQUESTION: {user_query}"
-    
+
     extraction_config = config.get('extraction', {})
     provider = extraction_config.get('provider')
 
@@ -34,10 +78,7 @@ def generate_response(user_query: str, context_chunks: dict, config: dict) -> st
             # --- CORRECT: Gemini Generation Logic ---
             gemini_config = extraction_config.get('gemini', {})
             model_name = gemini_config.get('model', 'gemini-1.5-flash-latest')
-            model = genai.GenerativeModel(
-                model_name,
-                system_instruction=system_prompt
-            )
+            model = _get_gemini_model(model_name, system_prompt)
             response = model.generate_content(final_prompt)
             return response.text.strip()
 
@@ -55,13 +96,89 @@ def generate_response(user_query: str, context_chunks: dict, config: dict) -> st
                 ],
                 "stream": False
             }
-            response = requests.post(url, headers={"Content-Type": "application/json"}, data=json.dumps(payload))
+            response = _SESSION.post(
+                url,
+                data=orjson.dumps(payload),
+                headers={"Content-Type": "application/json"},
+                timeout=(3, 120)
+            )
             response.raise_for_status()
-            content = response.json().get("message", {}).get("content", "Error: No content in response.")
+            content = orjson.loads(response.content).get("message", {}).get("content", "Error: No content in response.")
             return content.strip()
         
         else:
             raise ValueError(f"Unsupported extraction provider: {provider}")
 
     except Exception as e:
-        return f"Error connecting to the generative model: {e}"
\ No newline at end of file
+        return f"{_ERROR_PREFIX} {e}"
+
+def stream_response(user_query: str, context_chunks: dict, config: dict, error_state: dict = None):
+    """
+    Streams a grounded response from the configured LLM, yielding text deltas
+    as they arrive so the first tokens can be shown long before the full
+    decode finishes (e.g. via st.write_stream).
+
+    If error_state is provided, a provider failure sets error_state["failed"]
+    to True before the error message is yielded. This out-of-band flag is the
+    reliable way to detect failure: a mid-stream error (timeout, reset,
+    safety-blocked chunk) lands after partial answer text, so the combined
+    output cannot be recognized by inspecting the text alone.
+    """
+    docs = context_chunks.get("documents") or [[]]
+    if not docs[0]:
+        # No retrieval hits: respond locally instead of paying an LLM round-trip
+        yield _NO_CONTEXT_RESPONSE
+        return
+
+    system_prompt = _SYSTEM_PROMPT
+    context_str = _build_context_str(context_chunks)
+    final_prompt = f"CONTEXT:\n{context_str}\n\nQUESTION: {user_query}"
+
+    extraction_config = config.get('extraction', {})
+    provider = extraction_config.get('provider')
+
+    try:
+        if provider == 'gemini':
+            gemini_config = extraction_config.get('gemini', {})
+            model_name = gemini_config.get('model', 'gemini-1.5-flash-latest')
+            model = _get_gemini_model(model_name, system_prompt)
+            for chunk in model.generate_content(final_prompt, stream=True):
+                if chunk.text:
+                    yield chunk.text
+
+        elif provider == 'local':
+            gen_model_config = extraction_config.get('local', {})
+            model = gen_model_config.get('model', 'llama3:latest')
+            url = gen_model_config.get('ollama_url')
+
+            payload = {
+                "model": model,
+                "messages": [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": final_prompt}
+                ],
+                "stream": True
+            }
+            with _SESSION.post(
+                url,
+                data=orjson.dumps(payload),
+                headers={"Content-Type": "application/json"},
+                stream=True,
+                timeout=(3, 120)
+            ) as response:
+                response.raise_for_status()
+                # Ollama streams one JSON object per line, each carrying a delta
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    delta = orjson.loads(line).get("message", {}).get("content", "")
+                    if delta:
+                        yield delta
+
+        else:
+            raise ValueError(f"Unsupported extraction provider: {provider}")
+
+    except Exception as e:
+        if error_state is not None:
+            error_state["failed"] = True
+        yield f"\n\n{_ERROR_PREFIX} {e}"
\ No newline at end of file
@@ -1,5 +1,8 @@
 # smart_chatbot/prompts.py
 
+import functools
+
+@functools.lru_cache(maxsize=1)
 def build_prompt() -> str:
     """
     Returns the final, hybrid "Chain-of-Thought + Metaprompt" system prompt.
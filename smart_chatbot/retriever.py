@@ -4,15 +4,20 @@ import chromadb
 from typing import List, Dict
 
 def retrieve_relevant_chunks(
-    query_embedding: List[float],
+    query_embeddings: List[List[float]],
     collection: chromadb.Collection,
     config: dict
 ) -> Dict:
     """
     Queries ChromaDB to find the most relevant document chunks.
 
+    Accepts a batch of query embeddings so multi-query flows (e.g. a query
+    plus a rewritten variant) amortize one Chroma call instead of issuing
+    N separate ones. Results come back as lists-of-lists, indexed as
+    documents[query_idx][rank].
+
     Args:
-        query_embedding (List[float]): The vectorized user query.
+        query_embeddings (List[List[float]]): One or more vectorized queries.
         collection (chromadb.Collection): The ChromaDB collection object.
         config (dict): Application configuration (for top_k).
 
@@ -23,8 +28,8 @@ def retrieve_relevant_chunks(
     top_k = config.get("vector_db", {}).get("top_k_results", 5)
 
     results = collection.query(
-        query_embeddings=[query_embedding],
+        query_embeddings=query_embeddings,
         n_results=top_k,
         include=["metadatas", "documents", "distances"]
     )
-    return results
\ No newline at end of file
+    return results
@@ -58,7 +58,7 @@ def main():
 
         try:
             q_embedding = embed_query(question, config)
-            top_chunks = retrieve_relevant_chunks(q_embedding, collection, config)
+            top_chunks = retrieve_relevant_chunks([q_embedding], collection, config)
             response = generate_response(question, top_chunks, config)
 
             print(f"\n🤖 Answer:\n{response}")
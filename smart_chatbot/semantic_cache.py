@@ -0,0 +1,109 @@
+# smart_chatbot/semantic_cache.py
+
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+import faiss
+import numpy as np
+
+
+class SemanticCache:
+    """
+    A small in-memory semantic cache over past query embeddings.
+
+    Exact-match caching misses paraphrases ("What did PBAC decide about X?"
+    vs "PBAC decision on X?"). This cache keeps a FAISS inner-product index
+    of L2-normalized query embeddings; if a new query's nearest cached
+    neighbour has cosine similarity >= the threshold, the stored retrieval
+    results and response are reused verbatim, skipping both the Chroma
+    search and the LLM generation.
+    """
+
+    def __init__(self, threshold: float = 0.97, cache_file: str = "cache_file.json"):
+        self.threshold = threshold
+        self.cache_file = cache_file
+        self.index: Optional[faiss.IndexFlatIP] = None  # built lazily once the embedding dim is known
+        self.prompts: List[str] = []
+        self.chunk_dicts: List[Dict[str, Any]] = []
+        self.responses: List[str] = []
+        self._embeddings: List[List[float]] = []  # kept for persistence/rebuild
+        # The cache lives in st.cache_resource and is shared across session
+        # threads, so index/list mutation and reads must be serialized.
+        self._lock = threading.Lock()
+        self._load()
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        """Returns the embedding as a (1, dim) L2-normalized float32 array."""
+        vec = np.asarray([embedding], dtype='float32')
+        faiss.normalize_L2(vec)
+        return vec
+
+    def lookup(self, embedding: List[float]) -> Optional[Dict[str, Any]]:
+        """
+        Returns the cached entry for the nearest stored prompt if its cosine
+        similarity meets the threshold, otherwise None.
+        """
+        if not embedding:
+            return None
+        vec = self._normalize(embedding)
+        with self._lock:
+            if self.index is None or self.index.ntotal == 0:
+                return None
+            distances, indices = self.index.search(vec, 1)
+            if distances[0, 0] >= self.threshold:
+                i = int(indices[0, 0])
+                return {
+                    "prompt": self.prompts[i],
+                    "context_chunks": self.chunk_dicts[i],
+                    "response_text": self.responses[i],
+                }
+        return None
+
+    def add(self, prompt: str, embedding: List[float], context_chunks: Dict[str, Any], response_text: str) -> None:
+        """Stores a completed query/response pair and persists the cache to disk."""
+        if not embedding:
+            return
+        vec = self._normalize(embedding)
+        with self._lock:
+            if self.index is None:
+                self.index = faiss.IndexFlatIP(vec.shape[1])
+            self.index.add(vec)
+            self.prompts.append(prompt)
+            self.chunk_dicts.append(context_chunks)
+            self.responses.append(response_text)
+            self._embeddings.append(vec[0].tolist())
+            self._save()
+
+    def _load(self) -> None:
+        """Restores cached entries from disk and rebuilds the FAISS index."""
+        if not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.prompts = data.get("prompts", [])
+            self.chunk_dicts = data.get("chunk_dicts", [])
+            self.responses = data.get("responses", [])
+            self._embeddings = data.get("embeddings", [])
+            if self._embeddings:
+                vecs = np.asarray(self._embeddings, dtype='float32')
+                self.index = faiss.IndexFlatIP(vecs.shape[1])
+                self.index.add(vecs)
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"Warning: could not load semantic cache from '{self.cache_file}': {e}")
+
+    def _save(self) -> None:
+        """Writes the cache contents to disk so they survive app restarts."""
+        try:
+            with open(self.cache_file, 'w', encoding='utf-8') as f:
+                json.dump({
+                    "prompts": self.prompts,
+                    "chunk_dicts": self.chunk_dicts,
+                    "responses": self.responses,
+                    "embeddings": self._embeddings,
+                }, f, ensure_ascii=False)
+        except OSError as e:
+            print(f"Warning: could not persist semantic cache to '{self.cache_file}': {e}")